@@ -1,9 +1,17 @@
 import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import argparse
 import sys
 import os
+from pathlib import Path
 import math
+import functools
+import bisect
+import csv
+import operator
+import numpy as np
 import termios
 import tty
 import select
@@ -15,6 +23,22 @@ from rich.panel import Panel
 from rich.layout import Layout
 from datetime import datetime
 import threading
+import queue
+
+# orjson is optional; it parses dump1090's aircraft.json faster than json
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    import json
+    json_loads = json.loads
+
+# numba is optional; it compiles the haversine loop used for row distances
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 class KeyListener:
     """Context manager for non-blocking keyboard input."""
     def __enter__(self):
@@ -31,14 +55,20 @@ class KeyListener:
     def stop(self):
         termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
 
-    def data_available(self):
-        return select.select([sys.stdin], [], [], 0) == ([sys.stdin], [], [])
-    
-    def read_char(self):
-        if self.data_available():
+    def wait_char(self, timeout):
+        """Blocks until a key is pressed or timeout seconds pass."""
+        r, _, _ = select.select([sys.stdin], [], [], timeout)
+        if r:
             return sys.stdin.read(1)
         return None
 
+# Data files live next to this script
+BASE_DIR = Path(__file__).resolve().parent
+CONFIG_PATH = BASE_DIR / "config.txt"
+ROUTES_PATH = BASE_DIR / "routes.txt"
+AIRLINES_PATH = BASE_DIR / "airlines.txt"
+AIRCRAFT_TYPES_PATH = BASE_DIR / "aircraft_types.txt"
+
 # Default Dump1090 URL
 DEFAULT_URL = "http://daphnis:8080/data/aircraft.json"
 
@@ -64,39 +94,123 @@ CONFIG = {
     "col_heading": "magenta"
 }
 
+def create_session():
+    """
+    Creates a shared requests Session so dump1090 polls and adsbdb lookups
+    reuse keep-alive connections instead of reconnecting on every request.
+    """
+    session = requests.Session()
+    # Only retry on gateway errors; a stalled connection is not retried, so a
+    # hung dump1090 or adsbdb costs at most one timeout
+    retry = Retry(total=2, connect=0, read=0, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+    # dump1090 is a single local host polled every few seconds
+    session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry))
+    # adsbdb lookups run from several background threads at once
+    session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=16, max_retries=retry))
+    return session
+
+SESSION = create_session()
+
+def build_table_columns():
+    """
+    Builds the (header, add_column options) specs for the flight table.
+    Colours only change when config.txt is loaded, so this runs once per load.
+    """
+    return (
+        ("Callsign", dict(style=CONFIG["col_callsign"], width=10)),
+        ("Ctry", dict(style=CONFIG["col_flag"], justify="center", width=4)),
+        ("Airline", dict(style=CONFIG["col_airline"], justify="left", width=24)),
+        ("Type", dict(style=CONFIG["col_type"], justify="left", width=8)),
+        ("Route", dict(style=CONFIG["col_route"], justify="left", width=10)),
+        ("Heading", dict(justify="right", style=CONFIG["col_heading"])),
+        ("Dist (nm)", dict(justify="right", style=CONFIG["col_dist"], width=6)),
+        ("Alt (ft)", dict(justify="right", style=CONFIG["col_alt"])),
+        ("VR (fpm)", dict(justify="right", style=CONFIG["col_vr"])),
+        ("Speed (kts)", dict(justify="right", style=CONFIG["col_speed"])),
+    )
+
+TABLE_COLUMNS = build_table_columns()
+
 AIRLINES = {}
 ROUTES = {}
 AIRCRAFT_TYPES = {}
 PENDING_LOOKUPS = set()
+# Lookups adsbdb could not answer: key -> time after which we may retry
+FAILED_LOOKUPS = {}
+FAILED_LOOKUP_TTL = 1800 # seconds, when adsbdb has no data for the key
+FAILED_LOOKUP_RETRY = 60 # seconds, after a network error, 429 or 5xx
+# Guards PENDING_LOOKUPS and FAILED_LOOKUPS; ROUTES/AIRLINES/AIRCRAFT_TYPES
+# are only ever read or set one key at a time, so they go without
+LOOKUP_LOCK = threading.Lock()
+
+def lookup_retry_delay(answered):
+    """
+    Returns how long to wait before retrying an unresolved lookup.
+    A definite "no data" answer from adsbdb (404, or 200 without the
+    fields) is trusted for FAILED_LOOKUP_TTL; anything else, such as a
+    network error, 429 or 5xx, only backs off for FAILED_LOOKUP_RETRY.
+    """
+    return FAILED_LOOKUP_TTL if answered else FAILED_LOOKUP_RETRY
+
+def claim_lookup(key):
+    """
+    Marks a background lookup for key as in flight.
+    Returns False if it already is, or recently failed.
+    """
+    with LOOKUP_LOCK:
+        if key in PENDING_LOOKUPS:
+            return False
+        retry_at = FAILED_LOOKUPS.get(key)
+        if retry_at is not None and time.time() < retry_at:
+            return False
+        PENDING_LOOKUPS.add(key)
+        return True
+
+def release_lookup(key, failed, answered):
+    """
+    Clears the in-flight mark for key, recording a failure if needed.
+    """
+    with LOOKUP_LOCK:
+        if failed:
+            FAILED_LOOKUPS[key] = time.time() + lookup_retry_delay(answered)
+        PENDING_LOOKUPS.discard(key)
+
+def sweep_failed_lookups():
+    """
+    Drops expired entries from FAILED_LOOKUPS.
+    """
+    now = time.time()
+    with LOOKUP_LOCK:
+        for key in [k for k, retry_at in FAILED_LOOKUPS.items() if now >= retry_at]:
+            del FAILED_LOOKUPS[key]
 
 def load_config():
     """
     Loads configuration from config.txt.
     """
-    global CONFIG, LOCATION_NAME, DEFAULT_LAT, DEFAULT_LON
-    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.txt")
+    global CONFIG, LOCATION_NAME, DEFAULT_LAT, DEFAULT_LON, REF_LAT_RAD, REF_LON_RAD, COS_REF_LAT, FLAT_RANK_MARGIN, TABLE_COLUMNS
+    file_path = CONFIG_PATH
     
-    if os.path.exists(file_path):
+    if file_path.exists():
         try:
-            with open(file_path, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if "=" in line:
-                        key, value = line.split("=", 1)
-                        key = key.strip()
-                        value = value.strip()
-                        if key in CONFIG:
-                            # Type conversion
-                            if key in ["interval", "rows"]:
-                                try:
-                                    CONFIG[key] = int(value)
-                                except: pass
-                            elif key in ["location_lat", "location_lon"]:
-                                try:
-                                    CONFIG[key] = float(value)
-                                except: pass
-                            else:
-                                CONFIG[key] = value
+            for line in file_path.read_text().splitlines():
+                line = line.strip()
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    key = key.strip()
+                    value = value.strip()
+                    if key in CONFIG:
+                        # Type conversion
+                        if key in ["interval", "rows"]:
+                            try:
+                                CONFIG[key] = int(value)
+                            except: pass
+                        elif key in ["location_lat", "location_lon"]:
+                            try:
+                                CONFIG[key] = float(value)
+                            except: pass
+                        else:
+                            CONFIG[key] = value
         except Exception as e:
             print(f"Error loading config.txt: {e}")
     else:
@@ -108,12 +222,20 @@ def load_config():
     LOCATION_NAME = CONFIG["location_name"]
     DEFAULT_LAT = CONFIG["location_lat"]
     DEFAULT_LON = CONFIG["location_lon"]
+    # Receiver position is fixed for the run; precompute for the distance maths
+    REF_LAT_RAD = math.radians(DEFAULT_LAT)
+    REF_LON_RAD = math.radians(DEFAULT_LON)
+    COS_REF_LAT = math.cos(REF_LAT_RAD)
+    # Relative error of the flat approximation grows by about
+    # tan(lat) * range / earth radius; this allows twice that
+    FLAT_RANK_MARGIN = 2 * abs(math.tan(REF_LAT_RAD)) / 3440.065
+    TABLE_COLUMNS = build_table_columns()
 
 def save_config():
     """
     Saves current configuration to config.txt.
     """
-    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.txt")
+    file_path = CONFIG_PATH
     try:
         with open(file_path, "w") as f:
             f.write(f"url={CONFIG['url']}\n")
@@ -136,59 +258,187 @@ def save_config():
     except Exception as e:
         pass
 
+# Lines waiting to be appended to the .txt files: (file_path, line)
+PERSIST_QUEUE = queue.Queue()
+PERSIST_BATCH_SIZE = 16
+PERSIST_FLUSH_INTERVAL = 2 # seconds
+PERSIST_WRITER = None
+
+def persist_line(file_path, line):
+    """
+    Queues a line to be appended to file_path by the persist writer thread.
+    """
+    PERSIST_QUEUE.put((file_path, line))
+
+def write_persist_batch(batch):
+    """
+    Appends a batch of queued lines, opening each file once.
+    """
+    lines_by_file = {}
+    for file_path, line in batch:
+        lines_by_file.setdefault(file_path, []).append(line)
+
+    for file_path, lines in lines_by_file.items():
+        try:
+            with open(file_path, "a") as f:
+                f.write("\n" + "\n".join(lines))
+        except Exception:
+            pass
+
+def persist_writer_thread():
+    """
+    Background thread that drains PERSIST_QUEUE, writing every
+    PERSIST_FLUSH_INTERVAL seconds or PERSIST_BATCH_SIZE lines, whichever
+    comes first. A None item flushes what is left and stops the thread.
+    """
+    while True:
+        item = PERSIST_QUEUE.get()
+        batch = []
+        stop = item is None
+        if not stop:
+            batch.append(item)
+            deadline = time.time() + PERSIST_FLUSH_INTERVAL
+            while len(batch) < PERSIST_BATCH_SIZE:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = PERSIST_QUEUE.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+        if stop:
+            # Pick up lines from lookups that finished after the stop request
+            while True:
+                try:
+                    item = PERSIST_QUEUE.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    batch.append(item)
+
+        if batch:
+            write_persist_batch(batch)
+        if stop:
+            return
+
+def start_persist_writer():
+    """
+    Starts the background thread that appends looked-up data to disk.
+    """
+    global PERSIST_WRITER
+    PERSIST_WRITER = threading.Thread(target=persist_writer_thread, daemon=True)
+    PERSIST_WRITER.start()
+
+def stop_persist_writer():
+    """
+    Flushes any queued lines and waits for the writer thread to finish.
+    """
+    if PERSIST_WRITER and PERSIST_WRITER.is_alive():
+        PERSIST_QUEUE.put(None)
+        PERSIST_WRITER.join(timeout=5)
+
+class RateLimiter:
+    """Token bucket shared by the lookup workers to pace calls to adsbdb."""
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a call is allowed."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# Route and type lookups run on a small fixed pool, at most 4 requests/s.
+# Queued items are (function, argument).
+LOOKUP_QUEUE = queue.Queue()
+LOOKUP_WORKERS = 4
+ADSBDB_LIMITER = RateLimiter(rate=4, burst=4)
+
+def lookup_worker_thread():
+    """
+    Background thread that runs queued adsbdb lookups one at a time.
+    """
+    while True:
+        func, arg = LOOKUP_QUEUE.get()
+        func(arg)
+
+def start_lookup_workers():
+    """
+    Starts the lookup pool. Workers are daemon threads so quitting never
+    waits on a slow adsbdb request.
+    """
+    for _ in range(LOOKUP_WORKERS):
+        threading.Thread(target=lookup_worker_thread, daemon=True).start()
+
 def fetch_flight_data(url):
     """
     Fetches flight data from the local dump1090-fa instance.
     """
     try:
-        response = requests.get(url, timeout=5)
+        response = SESSION.get(url, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = json_loads(response.content)
         return data.get("aircraft", [])
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:
         return None
 
 def fetch_type_thread(hex_code):
     """
-    Background thread to fetch aircraft type from api.adsbdb.com
+    Background task to fetch aircraft type from api.adsbdb.com
     """
-    global AIRCRAFT_TYPES, PENDING_LOOKUPS
+    global AIRCRAFT_TYPES
     url = f"https://api.adsbdb.com/v0/aircraft/{hex_code}"
+    answered = False
     try:
-        response = requests.get(url, timeout=10)
+        ADSBDB_LIMITER.acquire()
+        response = SESSION.get(url, timeout=10)
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
             ac = data.get("response", {}).get("aircraft", {})
             
             icao_type = ac.get("icao_type")
             
             if icao_type:
-                AIRCRAFT_TYPES[hex_code] = icao_type
+                AIRCRAFT_TYPES[hex_code] = sys.intern(icao_type)
                 
                 # Persist to aircraft_types.txt
-                file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aircraft_types.txt")
-                try:
-                    with open(file_path, "a") as f:
-                        f.write(f"\n{hex_code},{icao_type}")
-                except Exception:
-                    pass
+                persist_line(AIRCRAFT_TYPES_PATH, f"{hex_code},{icao_type}")
+            answered = True
+        elif response.status_code == 404:
+            answered = True
     except Exception:
         pass
     finally:
-        key = f"HEX:{hex_code}"
-        if key in PENDING_LOOKUPS:
-            PENDING_LOOKUPS.remove(key)
+        release_lookup(f"HEX:{hex_code}", hex_code not in AIRCRAFT_TYPES, answered)
 
 def fetch_route_thread(callsign):
     """
-    Background thread to fetch route and airline data from api.adsbdb.com
+    Background task to fetch route and airline data from api.adsbdb.com
     """
-    global ROUTES, PENDING_LOOKUPS, AIRLINES
+    global ROUTES, AIRLINES
     url = f"https://api.adsbdb.com/v0/callsign/{callsign}"
+    answered = False
     try:
-        response = requests.get(url, timeout=10)
+        ADSBDB_LIMITER.acquire()
+        response = SESSION.get(url, timeout=10)
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
             fr = data.get("response", {}).get("flightroute", {})
             
             # 1. Routes
@@ -200,12 +450,7 @@ def fetch_route_thread(callsign):
                 ROUTES[callsign] = route_str
                 
                 # Persist to routes.txt
-                file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routes.txt")
-                try:
-                    with open(file_path, "a") as f:
-                        f.write(f"\n{callsign},{origin},{dest}")
-                except Exception:
-                    pass
+                persist_line(ROUTES_PATH, f"{callsign},{origin},{dest}")
 
             # 2. Airlines
             al = fr.get("airline", {})
@@ -215,39 +460,105 @@ def fetch_route_thread(callsign):
             if icao and name:
                 # Check if we already have this airline
                 if icao not in AIRLINES:
-                    AIRLINES[icao] = name
+                    AIRLINES[icao] = sys.intern(name)
                     # Persist to airlines.txt
-                    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "airlines.txt")
-                    try:
-                        with open(file_path, "a") as f:
-                            f.write(f"\n{icao},{name}")
-                    except Exception:
-                        pass
+                    persist_line(AIRLINES_PATH, f"{icao},{name}")
+            answered = True
+        elif response.status_code == 404:
+            answered = True
 
     except Exception:
         pass # Silent fail in thread
     finally:
-        if callsign in PENDING_LOOKUPS:
-            PENDING_LOOKUPS.remove(callsign)
+        release_lookup(callsign, callsign not in ROUTES or not get_airline(callsign), answered)
 
-def calculate_distance(lat1, lon1, lat2, lon2):
+def haversine_batch(lats, lons, ref_lat_rad, ref_lon_rad, cos_ref, dists):
     """
-    Calculate the great circle distance between two points 
-    on the earth (specified in decimal degrees) in nautical miles.
+    Haversine distance in nautical miles from the reference point to each
+    point, written into dists. Positions must all be known (no NaN).
     """
-    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
-        return float('inf')
+    for i in range(lats.shape[0]):
+        lat1 = math.radians(lats[i])
+        dlat = lat1 - ref_lat_rad
+        dlon = math.radians(lons[i]) - ref_lon_rad
+        a = math.sin(dlat/2)**2 + math.cos(lat1) * cos_ref * math.sin(dlon/2)**2
+        dists[i] = 2 * math.asin(math.sqrt(a)) * 3440.065
 
-    # Convert decimal degrees to radians 
-    lon1, lat1, lon2, lat2 = map(math.radians, [lon1, lat1, lon2, lat2])
+if njit is not None:
+    haversine_batch = njit(cache=True, fastmath=True)(haversine_batch)
 
-    # Haversine formula 
-    dlon = lon2 - lon1 
-    dlat = lat2 - lat1 
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a)) 
+def calculate_distances(lats, lons):
+    """
+    Calculate the great circle distance from the receiver location to each
+    point (arrays of decimal degrees) in nautical miles.
+    Points with an unknown position (NaN) get an infinite distance.
+    """
+    if njit is not None:
+        # fastmath assumes no NaNs, so only known positions go to the kernel
+        dists = np.full(len(lats), np.inf)
+        known = ~(np.isnan(lats) | np.isnan(lons))
+        known_dists = np.empty(np.count_nonzero(known))
+        haversine_batch(lats[known], lons[known], REF_LAT_RAD, REF_LON_RAD, COS_REF_LAT, known_dists)
+        dists[known] = known_dists
+        return dists
+
+    # Haversine formula, vectorised over all aircraft
+    lat1 = np.radians(lats)
+    dlat = lat1 - REF_LAT_RAD
+    dlon = np.radians(lons) - REF_LON_RAD
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * COS_REF_LAT * np.sin(dlon/2)**2
+    c = 2 * np.arcsin(np.sqrt(a))
     r = 3440.065 # Radius of earth in nautical miles
-    return c * r
+    dists = c * r
+    return np.where(np.isnan(dists), np.inf, dists)
+
+def calculate_distances_fast(lats, lons):
+    """
+    Flat (equirectangular) approximation of the squared distance from the
+    receiver location to each point, in square degrees of latitude.
+    Only good for ranking within receiver range; no trig per point.
+    Points with an unknown position (NaN) get an infinite distance.
+    """
+    x = (lons - DEFAULT_LON) * COS_REF_LAT
+    y = lats - DEFAULT_LAT
+    dists_sq = x*x + y*y
+    return np.where(np.isnan(dists_sq), np.inf, dists_sq)
+
+def select_nearest(lats, lons, max_rows):
+    """
+    Returns the indices of the max_rows nearest points and their exact
+    distances, nearest first.
+    Every point is ranked with the flat approximation; those within its
+    error margin of the max_rows-th point are kept, and the exact distance
+    picks the final rows from that small set.
+    """
+    rank = calculate_distances_fast(lats, lons)
+
+    # Handle cases where requested rows > available flights safely
+    if max_rows < len(rank):
+        kth = np.partition(rank, max_rows - 1)[max_rows - 1]
+        reach = math.sqrt(kth) * 60 # nm
+        limit = reach * (1 + FLAT_RANK_MARGIN * reach) / 60
+        candidates = np.flatnonzero(rank <= limit * limit)
+    else:
+        candidates = np.arange(len(rank))
+
+    dists = calculate_distances(lats[candidates], lons[candidates])
+    order = np.argsort(dists, kind="stable")[:max_rows]
+    return candidates[order], dists[order]
+
+# Placeholders for cells with no data
+NO_VALUE = "---"
+NO_VALUE_SHORT = "-"
+
+def format_number(value, spec, default):
+    """
+    Formats value with the given format spec if it is a number,
+    otherwise returns default (e.g. alt_baro can be "ground").
+    """
+    if not isinstance(value, (int, float)):
+        return default
+    return format(value, spec)
 
 def generate_table(flights, source_url, max_rows=10):
     """
@@ -255,34 +566,20 @@ def generate_table(flights, source_url, max_rows=10):
     """
     table = Table(title=f"Flight Tracker: {LOCATION_NAME}", box=box.HORIZONTALS)
 
-    table.add_column("Callsign", style=CONFIG["col_callsign"], width=10)
-    table.add_column("Ctry", style=CONFIG["col_flag"], justify="center", width=4)
-    table.add_column("Airline", style=CONFIG["col_airline"], justify="left", width=24)
-    table.add_column("Type", style=CONFIG["col_type"], justify="left", width=8)
-    table.add_column("Route", style=CONFIG["col_route"], justify="left", width=10)
-    table.add_column("Heading", justify="right", style=CONFIG["col_heading"])
-    table.add_column("Dist (nm)", justify="right", style=CONFIG["col_dist"], width=6)
-    table.add_column("Alt (ft)", justify="right", style=CONFIG["col_alt"])
-    table.add_column("VR (fpm)", justify="right", style=CONFIG["col_vr"])
-    table.add_column("Speed (kts)", justify="right", style=CONFIG["col_speed"])
+    for header, options in TABLE_COLUMNS:
+        table.add_column(header, **options)
     
     if flights is None:
         table.add_row("ERROR", "", "", "", "", "", "", "", "", f"Could not connect to {source_url}")
     elif not flights:
         table.add_row("-", "-", "-", "-", "-", "-", "-", "-", "-", "No aircraft seen recently")
     else:
-        # Calculate distances and sort
-        flights_with_dist = []
-        for f in flights:
-            dist = calculate_distance(f.get("lat"), f.get("lon"), DEFAULT_LAT, DEFAULT_LON)
-            flights_with_dist.append((f, dist))
-        
-        # Sort by distance
-        flights_with_dist.sort(key=lambda x: x[1])
+        lats = np.fromiter((np.nan if f.get("lat") is None else f["lat"] for f in flights), dtype=np.float64, count=len(flights))
+        lons = np.fromiter((np.nan if f.get("lon") is None else f["lon"] for f in flights), dtype=np.float64, count=len(flights))
         
-        # Take nearest N (max_rows)
-        # Handle cases where requested rows > available flights safely via slice
-        nearest_flights = flights_with_dist[:max_rows]
+        # Take nearest N (max_rows), nearest first
+        nearest_idx, dists = select_nearest(lats, lons, max_rows)
+        nearest_flights = [(flights[i], dist) for i, dist in zip(nearest_idx, dists)]
 
         for f, dist in nearest_flights:
             callsign = f.get("flight", "").strip()
@@ -305,9 +602,8 @@ def generate_table(flights, source_url, max_rows=10):
                 missing_data = True
 
             # Trigger background lookup if missing data and not pending
-            if missing_data and callsign and callsign not in PENDING_LOOKUPS:
-                PENDING_LOOKUPS.add(callsign)
-                threading.Thread(target=fetch_route_thread, args=(callsign,), daemon=True).start()
+            if missing_data and callsign and claim_lookup(callsign):
+                LOOKUP_QUEUE.put((fetch_route_thread, callsign))
 
             # Aircraft Type Lookup
             hex_code = f.get("hex", "").upper()
@@ -317,29 +613,14 @@ def generate_table(flights, source_url, max_rows=10):
                 aircraft_type = ""
                 # Trigger hex lookup if not pending
                 key = f"HEX:{hex_code}"
-                if hex_code and key not in PENDING_LOOKUPS:
-                    PENDING_LOOKUPS.add(key)
-                    threading.Thread(target=fetch_type_thread, args=(hex_code,), daemon=True).start()
-
-            if dist == float('inf'):
-                dist_str = "-"
-            else:
-                dist_str = f"{dist:.1f}"
-
-            altitude = f.get('alt_baro')
-            if isinstance(altitude, (int, float)):
-                alt = f"{altitude:,}"
-            else:
-                alt = "---"
-
-            v_rate = f.get('baro_rate')
-            if isinstance(v_rate, (int, float)):
-                vr = f"{v_rate:+,}"
-            else:
-                vr = "-"
-
-            speed = f"{f.get('gs', '---')}"
-            track = f"{f.get('track', '---')}"
+                if hex_code and claim_lookup(key):
+                    LOOKUP_QUEUE.put((fetch_type_thread, hex_code))
+
+            dist_str = NO_VALUE_SHORT if dist == math.inf else format(dist, ".1f")
+            alt = format_number(f.get('alt_baro'), ",", NO_VALUE)
+            vr = format_number(f.get('baro_rate'), "+,", NO_VALUE_SHORT)
+            speed = str(f.get('gs', NO_VALUE))
+            track = str(f.get('track', NO_VALUE))
             
             table.add_row(
                 callsign,
@@ -383,18 +664,16 @@ def load_airlines():
     """
     global AIRLINES
     AIRLINES = {}
-    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "airlines.txt")
+    file_path = AIRLINES_PATH
     
-    if os.path.exists(file_path):
+    if file_path.exists():
         try:
-            with open(file_path, "r") as f:
-                for line in f:
-                    if "," in line:
-                        parts = line.strip().split(",", 1)
-                        if len(parts) == 2:
-                            code = parts[0].strip().upper()
-                            name = parts[1].strip()
-                            AIRLINES[code] = name
+            lines = file_path.read_text().splitlines()
+            # Names are interned so every row shows the same string object
+            AIRLINES = {
+                parts[0].strip().upper(): sys.intern(parts[1].strip())
+                for parts in (line.split(",", 1) for line in lines if "," in line)
+            }
             return f"Loaded {len(AIRLINES)} airlines from {file_path}"
         except Exception as e:
             return f"Error loading airlines.txt: {e}"
@@ -405,37 +684,23 @@ def sort_airlines():
     """
     Sorts airlines.txt alphabetically by the 3-letter code.
     """
-    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "airlines.txt")
-    if not os.path.exists(file_path):
+    file_path = AIRLINES_PATH
+    if not file_path.exists():
         return "airlines.txt not found."
     
     try:
-        lines = []
-        with open(file_path, "r") as f:
-            lines = f.readlines()
-        
-        # Parse and sort
-        data = []
-        valid_lines = []
-        comments = []
-        
-        for line in lines:
-            # simple check for comment or data
-            if "," in line:
-                parts = line.strip().split(",", 1)
-                data.append((parts[0].strip().upper(), parts[1].strip()))
-            else:
-                # keep empty lines or garbage at end? Or just ignore/preserve
-                # Strategy: Keep non-data lines separate or at top? 
-                # Request says "sort by alphabetical first 3 letters".
-                # We will just sort the valid data lines.
-                pass
-        
-        data.sort(key=lambda x: x[0])
+        # Parse and sort the valid data lines; empty or garbage lines are dropped.
+        # Names may contain commas, so everything after the code is the name.
+        # The file is plain comma-split, not quoted CSV, so quotes are kept as-is.
+        with open(file_path, "r", newline="") as f:
+            data = sorted(
+                ((row[0].strip().upper(), ",".join(row[1:]).strip()) for row in csv.reader(f, quoting=csv.QUOTE_NONE) if len(row) >= 2),
+                key=operator.itemgetter(0)
+            )
         
+        # Written unquoted, in the format load_airlines() expects
         with open(file_path, "w") as f:
-            for code, name in data:
-                f.write(f"{code},{name}\n")
+            f.writelines(f"{code},{name}\n" for code, name in data)
         
         # Reload to apply changes
         load_airlines()
@@ -450,21 +715,17 @@ def load_routes():
     """
     global ROUTES
     ROUTES = {}
-    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routes.txt")
+    file_path = ROUTES_PATH
     
-    if os.path.exists(file_path):
+    if file_path.exists():
         try:
-            with open(file_path, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    parts = line.split(",")
-                    if len(parts) >= 3:
-                        callsign = parts[0].strip().upper() # Use upper for lookup key
-                        origin = parts[1].strip()
-                        dest = parts[2].strip()
-                        ROUTES[callsign] = f"{origin}/{dest}"
+            lines = file_path.read_text().splitlines()
+            ROUTES = {
+                # Use upper for lookup key
+                row[0].strip().upper(): f"{row[1].strip()}/{row[2].strip()}"
+                for row in csv.reader(lines, quoting=csv.QUOTE_NONE)
+                if len(row) >= 3 and not row[0].lstrip().startswith("#")
+            }
         except Exception as e:
             print(f"Error loading routes.txt: {e}")
 
@@ -475,74 +736,52 @@ def load_aircraft_types():
     """
     global AIRCRAFT_TYPES
     AIRCRAFT_TYPES = {}
-    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aircraft_types.txt")
+    file_path = AIRCRAFT_TYPES_PATH
     
-    if os.path.exists(file_path):
+    if file_path.exists():
         try:
-            with open(file_path, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-                    if "," in line:
-                        parts = line.split(",")
-                        if len(parts) >= 2:
-                            hex_code = parts[0].strip().upper()
-                            atype = parts[1].strip()
-                            AIRCRAFT_TYPES[hex_code] = atype
+            lines = file_path.read_text().splitlines()
+            # Type codes repeat across many airframes; intern to share them
+            AIRCRAFT_TYPES = {
+                parts[0].strip().upper(): sys.intern(parts[1].strip())
+                for parts in (line.split(",") for line in lines if not line.lstrip().startswith("#"))
+                if len(parts) >= 2
+            }
         except Exception as e:
             print(f"Error loading aircraft_types.txt: {e}")
 
+# Country ISO code by ICAO 24-bit address block: (start, end, code), sorted by start
+FLAG_RANGES = [
+    (0x300000, 0x30FFFF, "IT"), # Italy
+    (0x340000, 0x34FFFF, "ES"), # Spain
+    (0x380000, 0x3BFFFF, "FR"), # France
+    (0x3C0000, 0x3DFFFF, "DE"), # Germany
+    (0x400000, 0x43FFFF, "GB"), # UK
+    (0x440000, 0x44FFFF, "BE"), # Belgium
+    (0x480000, 0x487FFF, "NL"), # Netherlands
+    (0x488000, 0x48FFFF, "PL"), # Poland
+    (0x490000, 0x49FFFF, "PT"), # Portugal
+    (0x4C0000, 0x4CFFFF, "IE"), # Ireland (approx, 4CA... in practice)
+    (0xA00000, 0xAFFFFF, "US"), # USA
+]
+FLAG_STARTS = [start for start, _, _ in FLAG_RANGES]
+
+@functools.lru_cache(maxsize=4096)
 def get_flag(hex_code):
     """
     Returns a country ISO code based on ICAO 24-bit hex code.
     Replaces Emojis to guarantee perfect terminal alignment.
     """
+    # Fallback is 2 spaces
     try:
-        # Fallback is 2 spaces
-        if not hex_code:
-            return "  "
-        
-        # UK: 400000 - 43FFFF
-        if hex_code.startswith(("40", "41", "42", "43")):
-            return "GB"
-        # Ireland: 4CA... (approx range starts with 4C)
-        elif hex_code.startswith("4C"):
-            return "IE"
-        # France: 380000 - 3BFFFF
-        elif hex_code.startswith(("38", "39", "3A", "3B")):
-            return "FR"
-        # Germany: 3C0000 - 3DFFFF
-        elif hex_code.startswith(("3C", "3D")):
-            return "DE"
-        # USA: A00000 - AFFFFF
-        elif hex_code.startswith("A"):
-            return "US"
-        # Netherlands: 48xxxx
-        elif hex_code.startswith("48"):
-            return "NL"
-        # Belgium: 44xxxx
-        elif hex_code.startswith("44"):
-            return "BE"
-        # Spain: 34xxxx
-        elif hex_code.startswith("34"):
-            return "ES"
-        # Italy: 30xxxx
-        elif hex_code.startswith("30"):
-            return "IT"
-        # Portugal: 49xxxx
-        elif hex_code.startswith("49"):
-            return "PT"
-        # Poland: 48xxxx clashes with NL? Wait. 
-        # Netherlands: 480000-487FFF. Poland: 488000-48FFFF.
-        # Let's simple check 488+
-        elif hex_code.startswith("48") and hex_code > "487FFF":
-             return "PL"
-        
+        address = int(hex_code, 16)
+    except (TypeError, ValueError):
         return "  "
 
-    except:
-        return "  "
+    i = bisect.bisect_right(FLAG_STARTS, address) - 1
+    if i >= 0 and address <= FLAG_RANGES[i][1]:
+        return FLAG_RANGES[i][2]
+    return "  "
 
 
 
@@ -554,6 +793,12 @@ def main():
     load_airlines()
     load_routes()
     load_aircraft_types()
+    start_persist_writer()
+    start_lookup_workers()
+
+    if njit is not None:
+        # Compile the numba kernel now rather than during the first render
+        calculate_distances(np.zeros(1), np.zeros(1))
 
     parser = argparse.ArgumentParser(description="dump1090-fa Flight Tracker")
     parser.add_argument("--url", default=None, help=f"URL to aircraft.json")
@@ -616,9 +861,28 @@ def main():
         flights = []  # Initialize empty flight list
         with Live(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows), refresh_per_second=10) as live:
             last_update = 0
+            rendered_state = None
+
+            def refresh():
+                """Rebuilds the display, unless nothing it shows has changed."""
+                nonlocal rendered_state
+                state = (id(flights), last_update, show_help, notification_msg, notification_start_time, input_mode, input_buffer, current_max_rows, current_interval, current_url)
+                if state == rendered_state:
+                    return
+                rendered_state = state
+                live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
+
             while True:
+                # Sleep in select() until a key arrives or the next refresh
+                # or notification expiry is due
+                now = time.time()
+                wake_at = last_update + current_interval
+                if notification_msg:
+                    wake_at = min(wake_at, notification_start_time + 3)
+                timeout = min(0.5, max(0.0, wake_at - now))
+
                 # Handle Input
-                char = listener.read_char()
+                char = listener.wait_char(timeout)
                 if char:
                     # Input Mode Handling
                     if input_mode:
@@ -666,7 +930,7 @@ def main():
                         elif len(char) == 1 and char.isprintable():
                             input_buffer += char
                         
-                        live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
+                        refresh()
                     
                     # Normal Command Handling
                     else:
@@ -674,24 +938,24 @@ def main():
                             break
                         elif char.lower() == 'h':
                             show_help = not show_help
-                            live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
+                            refresh()
                         elif char.lower() == 's':
                             msg = sort_airlines()
                             notification_msg = msg
                             notification_start_time = time.time()
-                            live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
+                            refresh()
                         elif char.lower() == 'i':
                             input_mode = 'interval'
                             input_buffer = ""
-                            live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
+                            refresh()
                         elif char.lower() == 'n':
                             input_mode = 'rows'
                             input_buffer = ""
-                            live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
+                            refresh()
                         elif char.lower() == 'u':
                              input_mode = 'url'
                              input_buffer = ""
-                             live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
+                             refresh()
 
                 # Handle Updates
                 now = time.time()
@@ -699,18 +963,18 @@ def main():
                 # Clear notification after 3 seconds
                 if notification_msg and (now - notification_start_time > 3):
                     notification_msg = None
-                    live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
+                    refresh()
 
                 if now - last_update >= current_interval:
+                    sweep_failed_lookups()
                     flights = fetch_flight_data(current_url)
-                    live.update(get_renderable(flights, current_url, show_help, notification_msg, input_mode, input_buffer, current_max_rows))
                     last_update = now
-                
-                # Small sleep to save CPU
-                time.sleep(0.1)
+                    refresh()
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
         print("\nExiting Flight Tracker.")
+    finally:
+        stop_persist_writer()